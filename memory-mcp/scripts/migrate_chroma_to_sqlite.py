@@ -19,13 +19,58 @@ Note: chromadb library is NOT required. Reads chroma.sqlite3 directly.
 from __future__ import annotations
 
 import argparse
+import contextlib
+import hashlib
+import itertools
 import json
+import queue
 import sqlite3
 import sys
+import threading
+from collections.abc import Callable, Generator, Iterable, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
-
-
-def _ddl(conn: sqlite3.Connection) -> None:
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+def _or_none(value: Any) -> Any:
+    """空文字などの偽値を NULL に寄せる。"""
+    return value or None
+
+
+# memories テーブルのメタデータ由来カラム: (キー, 変換関数 or None=そのまま, デフォルト値)
+# id / content / normalized_content は記録本体から作るのでここには含めない
+_MEMORY_METADATA_COLUMNS: tuple[tuple[str, Callable[[Any], Any] | None, Any], ...] = (
+    ("timestamp", None, ""),
+    ("emotion", None, "neutral"),
+    ("importance", int, 3),
+    ("category", None, "daily"),
+    ("access_count", int, 0),
+    ("last_accessed", None, ""),
+    ("linked_ids", None, ""),
+    ("episode_id", _or_none, None),
+    ("sensory_data", None, ""),
+    ("camera_position", _or_none, None),
+    ("tags", None, ""),
+    ("links", None, ""),
+    ("novelty_score", float, 0.0),
+    ("prediction_error", float, 0.0),
+    ("activation_count", int, 0),
+    ("last_activated", None, ""),
+    ("reading", _or_none, None),
+)
+
+_MEMORY_COLUMNS = ("id", "content", "normalized_content") + tuple(c[0] for c in _MEMORY_METADATA_COLUMNS)
+_INSERT_MEMORY_SQL = (
+    f"INSERT OR IGNORE INTO memories ({', '.join(_MEMORY_COLUMNS)}) "
+    f"VALUES ({','.join('?' * len(_MEMORY_COLUMNS))})"
+)
+
+
+def _ddl_tables(conn: sqlite3.Connection) -> None:
+    """テーブルのみ作成する（インデックスはバルクロード後に _ddl_indexes で作る）。"""
     ddl = """
     CREATE TABLE IF NOT EXISTS memories (
         id TEXT PRIMARY KEY,
@@ -49,14 +94,11 @@ def _ddl(conn: sqlite3.Connection) -> None:
         last_activated TEXT NOT NULL DEFAULT '',
         reading TEXT
     );
-    CREATE INDEX IF NOT EXISTS idx_memories_emotion    ON memories(emotion);
-    CREATE INDEX IF NOT EXISTS idx_memories_category   ON memories(category);
-    CREATE INDEX IF NOT EXISTS idx_memories_timestamp  ON memories(timestamp);
-    CREATE INDEX IF NOT EXISTS idx_memories_importance ON memories(importance);
 
     CREATE TABLE IF NOT EXISTS embeddings (
         memory_id TEXT PRIMARY KEY REFERENCES memories(id) ON DELETE CASCADE,
-        vector BLOB NOT NULL
+        vector BLOB NOT NULL,
+        dtype TEXT NOT NULL DEFAULT 'f32'
     );
 
     CREATE TABLE IF NOT EXISTS coactivation (
@@ -65,8 +107,6 @@ def _ddl(conn: sqlite3.Connection) -> None:
         weight REAL NOT NULL CHECK(weight >= 0.0 AND weight <= 1.0),
         PRIMARY KEY (source_id, target_id)
     );
-    CREATE INDEX IF NOT EXISTS idx_coactivation_source ON coactivation(source_id);
-    CREATE INDEX IF NOT EXISTS idx_coactivation_target ON coactivation(target_id);
 
     CREATE TABLE IF NOT EXISTS episodes (
         id TEXT PRIMARY KEY,
@@ -81,27 +121,114 @@ def _ddl(conn: sqlite3.Connection) -> None:
         importance INTEGER NOT NULL DEFAULT 3
     );
     """
-    for stmt in ddl.strip().split(";"):
-        stmt = stmt.strip()
-        if stmt:
-            conn.execute(stmt)
-    conn.commit()
+    conn.executescript(ddl)
+
+    # 既存の memory.db（dtype 列の追加前に作られたもの）へ移行する場合は列を足す
+    # （MemoryStore の _upgrade_schema と同じ処理）
+    embedding_cols = {row[1] for row in conn.execute("PRAGMA table_info(embeddings)")}
+    if "dtype" not in embedding_cols:
+        conn.execute("ALTER TABLE embeddings ADD COLUMN dtype TEXT NOT NULL DEFAULT 'f32'")
+
+
+def _ddl_indexes(conn: sqlite3.Connection) -> None:
+    """セカンダリインデックスを作成する。
+
+    行を入れ終えてから作ると、SQLite は1回のソートでインデックスを構築できる
+    （1行ごとに B-tree を更新するより速い）。
+    """
+    ddl = """
+    CREATE INDEX IF NOT EXISTS idx_memories_emotion    ON memories(emotion);
+    CREATE INDEX IF NOT EXISTS idx_memories_category   ON memories(category);
+    CREATE INDEX IF NOT EXISTS idx_memories_timestamp  ON memories(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_memories_importance ON memories(importance);
+    CREATE INDEX IF NOT EXISTS idx_coactivation_source ON coactivation(source_id);
+    CREATE INDEX IF NOT EXISTS idx_coactivation_target ON coactivation(target_id);
+    """
+    conn.executescript(ddl)
+
+
+def _batched(iterable: Iterable[T], n: int) -> Iterator[list[T]]:
+    """iterable を n 件ずつのリストに区切る（itertools.batched の 3.10 互換版）。"""
+    it = iter(iterable)
+    while chunk := list(itertools.islice(it, n)):
+        yield chunk
+
+
+@dataclass
+class _MemoryChunk:
+    """移行パイプラインの各段を流れる、記憶レコード1チャンク分の行データ。"""
+
+    memory_rows: list[tuple] = field(default_factory=list)
+    coact_rows: list[tuple[str, str, float]] = field(default_factory=list)
+    ids: list[str] = field(default_factory=list)
+    docs: list[str] = field(default_factory=list)
+    embedding_rows: list[tuple[str, bytes, str]] = field(default_factory=list)
+    reused: list[tuple[str, str]] = field(default_factory=list)
+
+
+def _prefetch(iterable: Iterable[T], maxsize: int = 4) -> Generator[T, None, None]:
+    """iterable をバックグラウンドスレッドで回し、有界キュー経由で順に返す。
+
+    ワーカー側の例外は受け取り側で再送出する。受け取り側が途中でやめた
+    （close された）場合はワーカーも止めて join する。入力側の iterator は
+    close() を持つ場合だけ閉じるので、map などで包んだ _prefetch は呼び出し側で閉じること。
+    """
+    q: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+    errors: list[BaseException] = []
+
+    def _put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker() -> None:
+        it = iter(iterable)
+        try:
+            for item in it:
+                if not _put(item):
+                    break
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+            _put(done)
+
+    thread = threading.Thread(target=_worker, daemon=True)
+    thread.start()
+    try:
+        while (item := q.get()) is not done:
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        stop.set()
+        thread.join()
 
 
 def _read_chroma_collection(
     chroma_conn: sqlite3.Connection, collection_name: str
-) -> list[dict]:
+) -> Iterator[dict]:
     """ChromaDB の内部 SQLite から記憶データを直接読み取る。
 
-    Returns:
-        list of dicts with keys: id, document, metadata
+    全件をリストに溜めず、1件ずつ yield する。
+
+    Yields:
+        dicts with keys: id, document, metadata
     """
     # コレクション ID を取得
     col_row = chroma_conn.execute(
         "SELECT id FROM collections WHERE name = ?", (collection_name,)
     ).fetchone()
     if not col_row:
-        return []
+        return
     collection_id = col_row[0]
 
     # METADATA セグメント ID を取得
@@ -110,27 +237,24 @@ def _read_chroma_collection(
         (collection_id,),
     ).fetchone()
     if not seg_row:
-        return []
+        return
     segment_id = seg_row[0]
 
-    # このセグメントの全 embedding（記憶）を取得
-    emb_rows = chroma_conn.execute(
-        "SELECT id, embedding_id FROM embeddings WHERE segment_id = ?",
+    # このセグメントの全 embedding（記憶）とメタデータを1クエリで取得
+    # （メタデータを持たない embedding も残すため LEFT JOIN）
+    rows = chroma_conn.execute(
+        "SELECT e.id, e.embedding_id, m.key, m.string_value, m.int_value, m.float_value "
+        "FROM embeddings e LEFT JOIN embedding_metadata m ON m.id = e.id "
+        "WHERE e.segment_id = ? ORDER BY e.id",
         (segment_id,),
-    ).fetchall()
-
-    results = []
-    for row_id, embedding_id in emb_rows:
-        # 各記憶のメタデータを取得
-        meta_rows = chroma_conn.execute(
-            "SELECT key, string_value, int_value, float_value "
-            "FROM embedding_metadata WHERE id = ?",
-            (row_id,),
-        ).fetchall()
+    )
 
+    for (_, embedding_id), group in itertools.groupby(rows, key=lambda r: (r[0], r[1])):
         metadata: dict = {}
         document: str = ""
-        for key, str_val, int_val, float_val in meta_rows:
+        for _, _, key, str_val, int_val, float_val in group:
+            if key is None:
+                continue
             if key == "chroma:document":
                 document = str_val or ""
             elif str_val is not None:
@@ -140,20 +264,30 @@ def _read_chroma_collection(
             elif float_val is not None:
                 metadata[key] = float_val
 
-        results.append(
-            {
-                "id": embedding_id,
-                "document": document,
-                "metadata": metadata,
-            }
-        )
-
-    return results
+        yield {
+            "id": embedding_id,
+            "document": document,
+            "metadata": metadata,
+        }
 
 
-def migrate(source: str, dest: str) -> None:
+def _default_batch_size() -> int:
+    """GPU が使えるなら大きめ、CPU なら控えめなエンコードバッチサイズを返す。"""
     try:
-        import numpy as np
+        import torch
+    except ImportError:
+        return 128
+    return 256 if torch.cuda.is_available() else 128
+
+
+def migrate(
+    source: str, dest: str, batch_size: int | None = None, vector_dtype: str = "f32"
+) -> None:
+    if batch_size is not None and batch_size < 1:
+        # 0 だと islice が空を返し、何も移行せずに正常終了してしまう
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    try:
+        import numpy  # noqa: F401  (依存チェックのみ)
     except ImportError as e:
         print(f"Error: {e}")
         print("Install numpy: uv add numpy")
@@ -174,7 +308,8 @@ def migrate(source: str, dest: str) -> None:
     print()
 
     # ChromaDB の内部 SQLite を直接読む
-    chroma_conn = sqlite3.connect(str(chroma_sqlite))
+    # 読み込みはパイプラインのワーカースレッドから行うので check_same_thread=False
+    chroma_conn = sqlite3.connect(str(chroma_sqlite), check_same_thread=False)
 
     col_rows = chroma_conn.execute("SELECT name FROM collections").fetchall()
     collection_names = [r[0] for r in col_rows]
@@ -192,7 +327,7 @@ def migrate(source: str, dest: str) -> None:
     from memory_mcp.config import MemoryConfig
     from memory_mcp.embedding import E5EmbeddingFunction
     from memory_mcp.normalizer import normalize_japanese
-    from memory_mcp.vector import encode_vector
+    from memory_mcp.vector import encode_vectors_bulk
 
     config = MemoryConfig.from_env()
     print(f"Loading embedding model: {config.embedding_model} ...")
@@ -201,141 +336,171 @@ def migrate(source: str, dest: str) -> None:
     print("Model loaded.\n")
 
     # Open SQLite
-    conn = sqlite3.connect(str(dest_path), check_same_thread=False)
+    # isolation_level=None: 暗黙のトランザクションを無効化し、
+    # 各フェーズを BEGIN IMMEDIATE / COMMIT で明示的に囲む
+    conn = sqlite3.connect(str(dest_path), check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
     conn.execute("PRAGMA journal_mode = WAL")
-    _ddl(conn)
-
-    memory_ids_in_dest: set[str] = set()
+    # バルクロード向け: WAL 下では NORMAL でも破損しない（直近コミットのみ失われうる）
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA cache_size = -262144")  # 256 MiB
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA mmap_size = 268435456")  # 256 MiB
+    conn.execute("PRAGMA busy_timeout = 5000")
+    _ddl_tables(conn)
 
     # ── Migrate memories collection ────────────────────
     memories_collection_name = next(
         (n for n in collection_names if n != "episodes"), None
     )
     if memories_collection_name:
-        records = _read_chroma_collection(chroma_conn, memories_collection_name)
-        print(f"Migrating {len(records)} memories from '{memories_collection_name}'...")
-
-        coactivation_entries: list[tuple[str, str, float]] = []
-        docs_to_embed: list[str] = []
-        valid_records: list[dict] = []
+        if batch_size is None:
+            batch_size = _default_batch_size()
+        print(f"Migrating memories from '{memories_collection_name}'...")
+        print(f"  Computing embeddings with {config.embedding_model} (batch size {batch_size})")
+
+        # coactivation は相手側の記憶がまだ読み込まれていないことがあるので、
+        # いったん一時テーブルに溜めて最後に memories と JOIN して絞り込む
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS tmp_coact (source TEXT, target TEXT, weight REAL)"
+        )
+        # 同一テキストは1度だけ embedding する（E5 は決定的なので結果は同じ）。
+        # ベクトル自体は保持せず、テキストのダイジェスト → 最初に保存した memory_id だけ覚える
+        embedded_by_digest: dict[bytes, str] = {}
 
-        for rec in records:
-            memory_id = rec["id"]
-            meta = dict(rec["metadata"])
-            doc = rec["document"]
+        def parse_chunk(chunk: list[dict]) -> _MemoryChunk:
+            out = _MemoryChunk()
+            for rec in chunk:
+                memory_id = rec["id"]
+                meta = dict(rec["metadata"])
+                doc = rec["document"]
+
+                # Extract coactivation before insert
+                coact_raw = meta.pop("coactivation", "") or ""
+                if coact_raw:
+                    try:
+                        coact_dict = (
+                            json.loads(coact_raw) if isinstance(coact_raw, str) else coact_raw
+                        )
+                        if isinstance(coact_dict, dict):
+                            for target_id, weight in coact_dict.items():
+                                try:
+                                    w = float(weight)
+                                    w = max(0.0, min(1.0, w))
+                                    out.coact_rows.append((memory_id, target_id, w))
+                                except (TypeError, ValueError):
+                                    pass
+                    except (json.JSONDecodeError, TypeError):
+                        pass
+
+                # original content は metadata["content"] または document
+                original_content = meta.get("content") or doc
+                normalized = normalize_japanese(doc) if doc else ""
 
-            # Extract coactivation before insert
-            coact_raw = meta.pop("coactivation", "") or ""
-            if coact_raw:
                 try:
-                    coact_dict = (
-                        json.loads(coact_raw) if isinstance(coact_raw, str) else coact_raw
+                    out.memory_rows.append(
+                        (
+                            memory_id,
+                            original_content,
+                            normalized,
+                            *[
+                                meta.get(key, default) if convert is None else convert(meta.get(key, default))
+                                for key, convert, default in _MEMORY_METADATA_COLUMNS
+                            ],
+                        )
                     )
-                    if isinstance(coact_dict, dict):
-                        for target_id, weight in coact_dict.items():
-                            try:
-                                w = float(weight)
-                                w = max(0.0, min(1.0, w))
-                                coactivation_entries.append((memory_id, target_id, w))
-                            except (TypeError, ValueError):
-                                pass
-                except (json.JSONDecodeError, TypeError):
-                    pass
-
-            # original content は metadata["content"] または document
-            original_content = meta.get("content") or doc
-            episode_id = meta.get("episode_id") or None
-            if episode_id == "":
-                episode_id = None
-
-            normalized = normalize_japanese(doc) if doc else ""
-
+                    out.ids.append(memory_id)
+                    out.docs.append(normalized or original_content)
+                except Exception as e:
+                    print(f"  Warning: skipping memory {memory_id}: {e}")
+                    continue
+            return out
+
+        def embed_chunk(chunk: _MemoryChunk) -> _MemoryChunk:
+            new_ids: list[str] = []
+            new_docs: list[str] = []
+            for memory_id, text in zip(chunk.ids, chunk.docs):
+                digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+                source_id = embedded_by_digest.get(digest)
+                if source_id is None:
+                    embedded_by_digest[digest] = memory_id
+                    new_ids.append(memory_id)
+                    new_docs.append(text)
+                else:
+                    chunk.reused.append((memory_id, source_id))
+
+            # E5 で embedding を再計算（768次元）
+            if new_ids:
+                vecs = ef.encode_passage_ndarray(new_docs, batch_size=batch_size)
+                chunk.embedding_rows = [
+                    (memory_id, vec_bytes, vector_dtype)
+                    for memory_id, vec_bytes in zip(new_ids, encode_vectors_bulk(vecs, vector_dtype))
+                ]
+            return chunk
+
+        # 3段パイプライン: Chroma 読み込み+整形 / embedding / 書き込み（このスレッド）。
+        # SQLite への書き込みは1スレッドのまま、前2段の処理と重ねる。
+        # チャンク単位で流すので全件をメモリに載せない。SentenceTransformer.encode は
+        # チャンク内を長さ順に並べてからバッチを切るので、数バッチ分ずつ渡せばパディングも減る
+        records = _read_chroma_collection(chroma_conn, memories_collection_name)
+        n_memories = 0
+        n_reused = 0
+        # 外側を close しても入力側の map 経由では内側まで閉じられないので、両方を
+        # ExitStack に載せて逆順に止めて join する
+        with contextlib.ExitStack() as stack:
+            parsed = stack.enter_context(
+                contextlib.closing(_prefetch(map(parse_chunk, _batched(records, batch_size * 8))))
+            )
+            chunks = stack.enter_context(contextlib.closing(_prefetch(map(embed_chunk, parsed))))
+            conn.execute("BEGIN IMMEDIATE")
             try:
-                conn.execute(
-                    """INSERT OR IGNORE INTO memories (
-                        id, content, normalized_content, timestamp,
-                        emotion, importance, category, access_count, last_accessed,
-                        linked_ids, episode_id, sensory_data, camera_position,
-                        tags, links, novelty_score, prediction_error,
-                        activation_count, last_activated, reading
-                    ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-                    (
-                        memory_id,
-                        original_content,
-                        normalized,
-                        meta.get("timestamp", ""),
-                        meta.get("emotion", "neutral"),
-                        int(meta.get("importance", 3)),
-                        meta.get("category", "daily"),
-                        int(meta.get("access_count", 0)),
-                        meta.get("last_accessed", ""),
-                        meta.get("linked_ids", ""),
-                        episode_id,
-                        meta.get("sensory_data", ""),
-                        meta.get("camera_position") or None,
-                        meta.get("tags", ""),
-                        meta.get("links", ""),
-                        float(meta.get("novelty_score", 0.0)),
-                        float(meta.get("prediction_error", 0.0)),
-                        int(meta.get("activation_count", 0)),
-                        meta.get("last_activated", ""),
-                        meta.get("reading") or None,
-                    ),
-                )
-                memory_ids_in_dest.add(memory_id)
-                valid_records.append(rec)
-                docs_to_embed.append(normalized or original_content)
-            except Exception as e:
-                print(f"  Warning: failed to insert memory {memory_id}: {e}")
-                continue
-
-        conn.commit()
-        print(f"  Inserted {len(memory_ids_in_dest)} memories.")
-
-        # E5 で embedding を再計算（768次元）
-        print(f"  Re-computing embeddings ({config.embedding_model}) ...")
-        batch_size = 32
-        total = len(valid_records)
-        for i in range(0, total, batch_size):
-            batch_recs = valid_records[i : i + batch_size]
-            batch_docs = docs_to_embed[i : i + batch_size]
-            batch_vecs = ef(batch_docs)
-            for rec, vec in zip(batch_recs, batch_vecs):
-                memory_id = rec["id"]
-                if memory_id in memory_ids_in_dest:
-                    vec_bytes = encode_vector(np.array(vec, dtype=np.float32))
-                    conn.execute(
-                        "INSERT OR IGNORE INTO embeddings (memory_id, vector) VALUES (?,?)",
-                        (memory_id, vec_bytes),
-                    )
-            conn.commit()
-            done = min(i + batch_size, total)
-            print(f"  {done}/{total} embeddings done", end="\r", flush=True)
-        print(f"\n  Embeddings computed: {total}")
+                for chunk in chunks:
+                    if chunk.coact_rows:
+                        conn.executemany("INSERT INTO tmp_coact VALUES (?,?,?)", chunk.coact_rows)
+                    if not chunk.ids:
+                        continue
+                    conn.executemany(_INSERT_MEMORY_SQL, chunk.memory_rows)
+                    if chunk.embedding_rows:
+                        conn.executemany(
+                            "INSERT OR IGNORE INTO embeddings (memory_id, vector, dtype) VALUES (?,?,?)",
+                            chunk.embedding_rows,
+                        )
+                    if chunk.reused:
+                        conn.executemany(
+                            "INSERT OR IGNORE INTO embeddings (memory_id, vector, dtype) "
+                            "SELECT ?, vector, dtype FROM embeddings WHERE memory_id = ?",
+                            chunk.reused,
+                        )
+                    n_memories += len(chunk.ids)
+                    n_reused += len(chunk.reused)
+                    print(f"  {n_memories} memories done", end="\r", flush=True)
+            except BaseException:
+                # 途中で失敗したら書き込みロックを握ったままにしない
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        print(f"\n  Inserted {n_memories} memories with embeddings.")
+        if n_reused:
+            print(f"  Reused embeddings for {n_reused} duplicate texts.")
 
         # Insert coactivation (only where both sides exist)
-        coa_inserted = 0
-        for source_id, target_id, weight in coactivation_entries:
-            if source_id in memory_ids_in_dest and target_id in memory_ids_in_dest:
-                try:
-                    conn.execute(
-                        """INSERT OR IGNORE INTO coactivation (source_id, target_id, weight)
-                           VALUES (?,?,?)""",
-                        (source_id, target_id, weight),
-                    )
-                    coa_inserted += 1
-                except Exception:
-                    pass
-        conn.commit()
-        print(f"  Inserted {coa_inserted} coactivation weights.")
+        conn.execute("BEGIN IMMEDIATE")
+        cur = conn.execute(
+            """INSERT OR IGNORE INTO coactivation (source_id, target_id, weight)
+               SELECT t.source, t.target, t.weight FROM tmp_coact t
+               JOIN memories m1 ON m1.id = t.source
+               JOIN memories m2 ON m2.id = t.target"""
+        )
+        conn.execute("COMMIT")
+        conn.execute("DROP TABLE tmp_coact")
+        print(f"  Inserted {cur.rowcount} coactivation weights.")
 
     # ── Migrate episodes collection ────────────────────
     if "episodes" in collection_names:
         ep_records = _read_chroma_collection(chroma_conn, "episodes")
-        print(f"\nMigrating {len(ep_records)} episodes...")
-        ep_inserted = 0
+        print("\nMigrating episodes...")
+        episode_rows: list[tuple] = []
         for rec in ep_records:
             ep_id = rec["id"]
             meta = dict(rec["metadata"])
@@ -344,11 +509,7 @@ def migrate(source: str, dest: str) -> None:
             if end_time == "":
                 end_time = None
             try:
-                conn.execute(
-                    """INSERT OR IGNORE INTO episodes
-                       (id, title, start_time, end_time, memory_ids, participants,
-                        location_context, summary, emotion, importance)
-                       VALUES (?,?,?,?,?,?,?,?,?,?)""",
+                episode_rows.append(
                     (
                         ep_id,
                         meta.get("title", ""),
@@ -360,13 +521,26 @@ def migrate(source: str, dest: str) -> None:
                         summary,
                         meta.get("emotion", "neutral"),
                         int(meta.get("importance", 3)),
-                    ),
+                    )
                 )
-                ep_inserted += 1
             except Exception as e:
-                print(f"  Warning: failed to insert episode {ep_id}: {e}")
-        conn.commit()
-        print(f"  Inserted {ep_inserted} episodes.")
+                print(f"  Warning: skipping episode {ep_id}: {e}")
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            """INSERT OR IGNORE INTO episodes
+               (id, title, start_time, end_time, memory_ids, participants,
+                location_context, summary, emotion, importance)
+               VALUES (?,?,?,?,?,?,?,?,?,?)""",
+            episode_rows,
+        )
+        conn.execute("COMMIT")
+        print(f"  Inserted {len(episode_rows)} episodes.")
+
+    print("\nCreating indexes...")
+    _ddl_indexes(conn)
+
+    # 途中での自動チェックポイントに頼らず、最後に一度だけ WAL を書き戻して切り詰める
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
 
     chroma_conn.close()
     conn.close()
@@ -374,6 +548,17 @@ def migrate(source: str, dest: str) -> None:
     print(f"SQLite database: {dest_path}")
 
 
+def _positive_int(value: str) -> int:
+    """argparse 用: 1 以上の整数だけを受け付ける。"""
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Migrate ChromaDB memories to SQLite+numpy")
     parser.add_argument(
@@ -386,8 +571,26 @@ def main() -> None:
         default=str(Path.home() / ".claude" / "memories" / "memory.db"),
         help="Path to SQLite output file (default: ~/.claude/memories/memory.db)",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=_positive_int,
+        default=None,
+        help="Embedding batch size (default: 256 with CUDA, otherwise 128)",
+    )
+    parser.add_argument(
+        "--vector-dtype",
+        choices=["f32", "f16", "i8"],
+        default="f32",
+        help="Storage format for embedding vectors: f32 (default), f16 (half size) "
+        "or i8 (int8 with a per-vector scale, about a quarter size)",
+    )
     args = parser.parse_args()
-    migrate(source=args.source, dest=args.dest)
+    migrate(
+        source=args.source,
+        dest=args.dest,
+        batch_size=args.batch_size,
+        vector_dtype=args.vector_dtype,
+    )
 
 
 if __name__ == "__main__":
@@ -10,6 +10,8 @@ import logging
 import os
 from typing import Any, ClassVar
 
+import numpy as np
+
 # ネットワークアクセスを防止してローカルキャッシュのみ使用
 # MCP の env 設定に依存せずプロセス起動直後に適用する
 os.environ.setdefault("HF_HUB_OFFLINE", "1")
@@ -35,6 +37,9 @@ class E5EmbeddingFunction:
     # クラスレベルのモデルキャッシュ（model_name → SentenceTransformer）
     _model_cache: ClassVar[dict[str, Any]] = {}
 
+    PASSAGE_PREFIX: ClassVar[str] = "passage: "
+    QUERY_PREFIX: ClassVar[str] = "query: "
+
     def __init__(self, model_name: str = "intfloat/multilingual-e5-base") -> None:
         self._model_name = model_name
 
@@ -46,9 +51,14 @@ class E5EmbeddingFunction:
         """モデルを遅延ロード（クラスレベルキャッシュ使用）。"""
         if self._model_name not in E5EmbeddingFunction._model_cache:
             try:
+                import torch
                 from sentence_transformers import SentenceTransformer
 
                 model = SentenceTransformer(self._model_name, local_files_only=True)
+                model.eval()
+                if torch.cuda.is_available():
+                    # 推論専用なので GPU 上では fp16 で十分（メモリ転送量が半分になる）
+                    model.half()
                 E5EmbeddingFunction._model_cache[self._model_name] = model
                 logger.info("E5EmbeddingFunction: loaded model %s", self._model_name)
             except ImportError as e:
@@ -66,14 +76,22 @@ class E5EmbeddingFunction:
         Returns:
             埋め込みベクトルのリスト（各要素は float のリスト）
         """
-        self._load_model()
-        prefixed = [f"passage: {doc}" for doc in input]
-        embeddings = self._model.encode(
-            prefixed,
-            normalize_embeddings=True,
-            show_progress_bar=False,
-        )
-        return embeddings.tolist()
+        return self.encode_passage_ndarray(input).tolist()
+
+    def encode_passage_ndarray(self, input: list[str], batch_size: int = 32) -> np.ndarray:
+        """文書保存用埋め込みを 2 次元 ndarray のまま返す（passage: プレフィックス）。
+
+        一括移行など大量の文書をエンコードする場合に、Python リストへの
+        変換を挟まずそのまま使えるようにする。
+
+        Args:
+            input: エンコードするテキストのリスト
+            batch_size: SentenceTransformer に渡す内部バッチサイズ
+
+        Returns:
+            shape (len(input), dim) の float32 配列
+        """
+        return self._encode(self.PASSAGE_PREFIX, input, batch_size)
 
     def encode_query(self, texts: list[str]) -> list[list[float]]:
         """クエリ検索用埋め込み（query: プレフィックス）。
@@ -84,11 +102,24 @@ class E5EmbeddingFunction:
         Returns:
             埋め込みベクトルのリスト
         """
+        return self._encode(self.QUERY_PREFIX, texts).tolist()
+
+    def _encode(self, prefix: str, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        """プレフィックスを付けて正規化済み埋め込みを float32 配列で返す。
+
+        プレフィックスはトークン列ではなく文字列として連結する。
+        トークナイズ・特殊トークン付与・切り詰めは SentenceTransformer に
+        任せ、保存時と検索時で同じ前処理を保つため。
+        """
         self._load_model()
-        prefixed = [f"query: {t}" for t in texts]
-        embeddings = self._model.encode(
-            prefixed,
-            normalize_embeddings=True,
-            show_progress_bar=False,
-        )
-        return embeddings.tolist()
+        import torch
+
+        with torch.inference_mode():
+            embeddings = self._model.encode(
+                [prefix + t for t in texts],
+                batch_size=batch_size,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+            )
+        return np.asarray(embeddings, dtype=np.float32)
@@ -39,7 +39,7 @@ from .types import (
     ScoredMemory,
     SensoryData,
 )
-from .vector import cosine_similarity, decode_vector, encode_vector
+from .vector import VectorIndex, decode_vector, encode_vector
 from .working_memory import WorkingMemoryBuffer
 from .workspace import (
     WorkspaceCandidate,
@@ -81,7 +81,8 @@ CREATE INDEX IF NOT EXISTS idx_memories_importance ON memories(importance);
 
 CREATE TABLE IF NOT EXISTS embeddings (
     memory_id TEXT PRIMARY KEY REFERENCES memories(id) ON DELETE CASCADE,
-    vector BLOB NOT NULL
+    vector BLOB NOT NULL,
+    dtype TEXT NOT NULL DEFAULT 'f32'
 );
 
 CREATE TABLE IF NOT EXISTS coactivation (
@@ -107,6 +108,15 @@ CREATE TABLE IF NOT EXISTS episodes (
 );
 """
 
+
+def _upgrade_schema(conn: sqlite3.Connection) -> None:
+    """Add columns introduced after a database was first created."""
+    embedding_cols = {row[1] for row in conn.execute("PRAGMA table_info(embeddings)")}
+    if "dtype" not in embedding_cols:
+        conn.execute("ALTER TABLE embeddings ADD COLUMN dtype TEXT NOT NULL DEFAULT 'f32'")
+        conn.commit()
+
+
 # ──────────────────────────────────────────────
 # Score helpers (shared with memory.py callers)
 # ──────────────────────────────────────────────
@@ -278,6 +288,7 @@ class MemoryStore:
         self._hopfield = ModernHopfieldNetwork(beta=4.0, n_iters=3)
         self._embedding_fn = E5EmbeddingFunction(config.embedding_model)
         self._bm25_index = BM25Index()
+        self._vector_index = VectorIndex()
 
     # ── Connection ──────────────────────────────
 
@@ -292,11 +303,8 @@ class MemoryStore:
                     conn.row_factory = sqlite3.Row
                     conn.execute("PRAGMA foreign_keys = ON")
                     conn.execute("PRAGMA journal_mode = WAL")
-                    for stmt in _DDL.strip().split(";"):
-                        stmt = stmt.strip()
-                        if stmt:
-                            conn.execute(stmt)
-                    conn.commit()
+                    conn.executescript(_DDL)
+                    _upgrade_schema(conn)
                     return conn
 
                 self._db = await asyncio.to_thread(_open)
@@ -419,6 +427,7 @@ class MemoryStore:
 
         await asyncio.to_thread(_insert)
         self._bm25_index.mark_dirty()
+        self._vector_index.mark_dirty()
         await self._working_memory.add(memory)
         return memory
 
@@ -456,35 +465,36 @@ class MemoryStore:
             params.append(date_to)
 
         where_clause = ("WHERE " + " AND ".join(conditions)) if conditions else ""
-        sql = f"SELECT m.*, e.vector FROM memories m JOIN embeddings e ON m.id = e.memory_id {where_clause}"
-
-        def _query() -> list[tuple[sqlite3.Row, bytes]]:
-            rows = db.execute(sql, params).fetchall()
-            return [(row, bytes(row["vector"])) for row in rows]
+        sql = f"SELECT m.id FROM memories m JOIN embeddings e ON m.id = e.memory_id {where_clause}"
+        index = self._vector_index
 
-        rows_with_vecs = await asyncio.to_thread(_query)
-        if not rows_with_vecs:
+        def _query() -> tuple[list[str], np.ndarray] | None:
+            ids = [row[0] for row in db.execute(sql, params)]
+            if not ids:
+                return None
+            scores = None if index.is_dirty else index.similarities(query_vec, ids)
+            while scores is None:
+                # Rebuild from all rows if a save (possibly from another process) is not indexed
+                # yet; repeat if a concurrent search published an older rebuild over ours
+                entries = db.execute("SELECT memory_id, vector, dtype FROM embeddings").fetchall()
+                index.build([(r[0], bytes(r[1]), r[2]) for r in entries])
+                scores = index.similarities(query_vec, ids)
+            # higher = more similar
+            return ids, scores
+
+        found = await asyncio.to_thread(_query)
+        if found is None:
             return []
-
-        # Stack vectors for batch cosine similarity
-        vecs = np.stack([decode_vector(blob) for _, blob in rows_with_vecs])
-        scores = cosine_similarity(query_vec, vecs)  # higher = more similar
+        ids, scores = found
 
         # Convert similarity to distance (like ChromaDB cosine distance)
         # cosine distance = 1 - similarity
-        indexed = list(enumerate(rows_with_vecs))
-        ranked = sorted(indexed, key=lambda t: scores[t[0]], reverse=True)
-        ranked = ranked[:n_results]
-
-        results: list[tuple[Memory, float]] = []
-        for idx, (row, _) in ranked:
-            memory_id = row["id"]
-            coactivation = await asyncio.to_thread(self._get_coactivation, db, memory_id)
-            memory = _row_to_memory(row, coactivation)
-            distance = float(1.0 - scores[idx])
-            results.append((memory, distance))
+        ranked = sorted(range(len(ids)), key=lambda i: scores[i], reverse=True)[:n_results]
+        ranked_ids = [ids[i] for i in ranked]
+        memories = await asyncio.to_thread(self._fetch_memories_by_ids_sync, db, ranked_ids)
+        by_id = {m.id: m for m in memories}
 
-        return results
+        return [(by_id[ids[i]], float(1.0 - scores[i])) for i in ranked if ids[i] in by_id]
 
     # ── search ──────────────────────────────────
 
@@ -920,6 +930,7 @@ class MemoryStore:
 
         await asyncio.to_thread(_insert)
         self._bm25_index.mark_dirty()
+        self._vector_index.mark_dirty()
 
         for target_id in linked_ids:
             await self._add_bidirectional_link(memory_id, target_id)
@@ -1310,9 +1321,9 @@ class MemoryStore:
         """Load all embeddings from SQLite into Hopfield network."""
         db = self._ensure_connected()
 
-        def _fetch() -> list[tuple[str, bytes, str]]:
+        def _fetch() -> list[tuple[str, bytes, str, str]]:
             sql = (
-                "SELECT e.memory_id, e.vector, m.normalized_content"
+                "SELECT e.memory_id, e.vector, m.normalized_content, e.dtype"
                 " FROM embeddings e JOIN memories m ON m.id = e.memory_id"
             )
             return db.execute(sql).fetchall()
@@ -1323,7 +1334,7 @@ class MemoryStore:
             return 0
 
         ids = [r[0] for r in rows]
-        embeddings = [decode_vector(bytes(r[1])).tolist() for r in rows]
+        embeddings = [decode_vector(bytes(r[1]), r[3]).tolist() for r in rows]
         contents = [r[2] for r in rows]
         self._hopfield.store(embeddings, ids, contents)
         return self._hopfield.n_memories
@@ -20,11 +20,116 @@ def cosine_similarity(query: np.ndarray, corpus: np.ndarray) -> np.ndarray:
     return c_norm @ q_norm
 
 
+# Storage formats for embedding BLOBs (stored in embeddings.dtype)
+#   f32: float32 components
+#   f16: float16 components (half the size, ~1e-3 relative error)
+#   i8:  float32 per-vector scale followed by int8 components (~1/4 the size)
+VECTOR_DTYPES = ("f32", "f16", "i8")
+
+
 def encode_vector(vec: list[float]) -> bytes:
     """Encode a float list as numpy float32 bytes (for SQLite BLOB)."""
     return np.array(vec, dtype=np.float32).tobytes()
 
 
-def decode_vector(blob: bytes) -> np.ndarray:
-    """Decode numpy float32 bytes from SQLite BLOB."""
-    return np.frombuffer(blob, dtype=np.float32)
+def encode_vector_fp16(vec: list[float] | np.ndarray) -> bytes:
+    """Encode a vector as float16 bytes (dtype ``"f16"``)."""
+    return np.asarray(vec, dtype=np.float16).tobytes()
+
+
+def encode_vector_int8(vec: list[float] | np.ndarray) -> bytes:
+    """Encode a vector as a float32 scale plus int8 components (dtype ``"i8"``)."""
+    return encode_vectors_bulk(np.asarray(vec, dtype=np.float32)[np.newaxis, :], dtype="i8")[0]
+
+
+def encode_vectors_bulk(arr: np.ndarray, dtype: str = "f32") -> list[bytes]:
+    """Encode each row of a (n, dim) matrix as bytes in the given storage format.
+
+    Casts and serializes the whole matrix once, then slices per-row blobs out
+    of the single buffer. Each ``"f32"`` blob is identical to
+    ``encode_vector(row)``.
+    """
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"Unknown vector dtype '{dtype}'. Must be one of {VECTOR_DTYPES}.")
+    mat = np.asarray(arr, dtype=np.float32)
+    if mat.ndim != 2:
+        raise ValueError(f"Expected a 2-D array, got shape {mat.shape}")
+
+    if dtype == "i8":
+        peaks = np.abs(mat).max(axis=1, initial=0.0)
+        scales = np.where(peaks > 0, peaks / 127.0, 1.0).astype(np.float32)
+        quantized = np.clip(np.rint(mat / scales[:, np.newaxis]), -127, 127).astype(np.int8)
+        scale_bytes = scales.tobytes()
+        data = np.ascontiguousarray(quantized).tobytes()
+        stride = quantized.shape[1]
+        return [
+            scale_bytes[i * 4 : (i + 1) * 4] + data[i * stride : (i + 1) * stride]
+            for i in range(quantized.shape[0])
+        ]
+
+    buf = np.ascontiguousarray(mat, dtype=np.float16 if dtype == "f16" else np.float32)
+    data = buf.tobytes()
+    stride = buf.shape[1] * buf.itemsize
+    return [data[i * stride : (i + 1) * stride] for i in range(buf.shape[0])]
+
+
+def decode_vector(blob: bytes, dtype: str = "f32") -> np.ndarray:
+    """Decode a SQLite BLOB in the given storage format into a float32 vector."""
+    if dtype == "f32":
+        return np.frombuffer(blob, dtype=np.float32)
+    if dtype == "f16":
+        return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+    if dtype == "i8":
+        scale = np.frombuffer(blob, dtype=np.float32, count=1)[0]
+        return np.frombuffer(blob, dtype=np.int8, offset=4).astype(np.float32) * scale
+    raise ValueError(f"Unknown vector dtype '{dtype}'. Must be one of {VECTOR_DTYPES}.")
+
+
+class VectorIndex:
+    """All stored embeddings as one contiguous, row-normalized (n, dim) float32 matrix.
+
+    Like ``BM25Index``, it is marked dirty after a save and rebuilt from the
+    embeddings table on the next search, so a query is a single matrix-vector
+    product instead of fetching and decoding every BLOB again.
+
+    Searches run in worker threads, so the id -> row map and the matrix are
+    published together as one tuple; readers take a single snapshot of it.
+    """
+
+    def __init__(self) -> None:
+        self._state: tuple[dict[str, int], np.ndarray] = ({}, np.empty((0, 0), dtype=np.float32))
+        self._dirty = True
+
+    def build(self, entries: list[tuple[str, bytes, str]]) -> None:
+        """Rebuild from ``(memory_id, blob, dtype)`` tuples."""
+        rows = {memory_id: i for i, (memory_id, _, _) in enumerate(entries)}
+        if entries:
+            mat = np.stack([decode_vector(blob, dtype) for _, blob, dtype in entries])
+            mat /= np.linalg.norm(mat, axis=1, keepdims=True) + 1e-10
+            matrix = np.ascontiguousarray(mat, dtype=np.float32)
+        else:
+            matrix = np.empty((0, 0), dtype=np.float32)
+        self._state = (rows, matrix)
+        self._dirty = False
+
+    def mark_dirty(self) -> None:
+        """Rebuild on the next search."""
+        self._dirty = True
+
+    @property
+    def is_dirty(self) -> bool:
+        return self._dirty
+
+    def similarities(self, query: np.ndarray, memory_ids: list[str]) -> np.ndarray | None:
+        """Cosine similarity of the query against the given ids, shape (len(memory_ids),).
+
+        Returns None if any id is not indexed yet.
+        """
+        rows, matrix = self._state
+        try:
+            idx = np.fromiter((rows[i] for i in memory_ids), dtype=np.intp, count=len(memory_ids))
+        except KeyError:
+            return None
+        q_norm = np.asarray(query, dtype=np.float32)
+        q_norm = q_norm / (np.linalg.norm(q_norm) + 1e-10)
+        return (matrix @ q_norm)[idx]
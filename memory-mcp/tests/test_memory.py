@@ -1,7 +1,9 @@
 """Tests for memory operations."""
 
+import sqlite3
 from datetime import datetime, timedelta
 
+import numpy as np
 import pytest
 
 from memory_mcp.memory import (
@@ -11,6 +13,7 @@ from memory_mcp.memory import (
     calculate_importance_boost,
     calculate_time_decay,
 )
+from memory_mcp.vector import decode_vector, encode_vectors_bulk
 
 
 class TestMemorySave:
@@ -358,3 +361,61 @@ class TestSearchWithScoring:
         # With scoring disabled, time_decay should be 1.0 and emotion_boost 0.0
         assert result.time_decay_factor == 1.0
         assert result.emotion_boost == 0.0
+
+
+class TestVectorStorageFormats:
+    """Tests for quantized embedding BLOBs (embeddings.dtype)."""
+
+    @pytest.mark.asyncio
+    async def test_search_reads_quantized_vectors(self, memory_store: MemoryStore):
+        """f16 / i8 rows are decoded and searched alongside f32 rows."""
+        m_f32 = await memory_store.save(content="カメラで部屋を見た")
+        m_f16 = await memory_store.save(content="コードを書いた")
+        m_i8 = await memory_store.save(content="幼馴染と話した")
+        before = {r.memory.id: r.distance for r in await memory_store.search("幼馴染と話した", n_results=3)}
+
+        db = memory_store._ensure_connected()
+        for memory_id, dtype in ((m_f16.id, "f16"), (m_i8.id, "i8")):
+            blob = db.execute("SELECT vector FROM embeddings WHERE memory_id = ?", (memory_id,)).fetchone()[0]
+            vec = decode_vector(bytes(blob))
+            db.execute(
+                "UPDATE embeddings SET vector = ?, dtype = ? WHERE memory_id = ?",
+                (encode_vectors_bulk(vec[np.newaxis, :], dtype)[0], dtype, memory_id),
+            )
+        db.commit()
+        # Direct table edits bypass save(), so force the in-memory matrix to reload
+        memory_store._vector_index.mark_dirty()
+
+        results = await memory_store.search("幼馴染と話した", n_results=3)
+
+        assert {r.memory.id for r in results} == {m_f32.id, m_f16.id, m_i8.id}
+        for r in results:
+            assert r.distance == pytest.approx(before[r.memory.id], abs=0.01)
+
+    @pytest.mark.asyncio
+    async def test_search_sees_memories_saved_after_index_build(self, memory_store: MemoryStore):
+        """A save after a search is picked up by the next search."""
+        first = await memory_store.save(content="カメラで部屋を見た")
+        assert [r.memory.id for r in await memory_store.search("部屋", n_results=5)] == [first.id]
+
+        second = await memory_store.save(content="コードを書いた")
+        results = await memory_store.search("コード", n_results=5)
+
+        assert {r.memory.id for r in results} == {first.id, second.id}
+
+    @pytest.mark.asyncio
+    async def test_connect_adds_dtype_column(self, memory_config):
+        """Databases created before the dtype column get it on connect."""
+        conn = sqlite3.connect(memory_config.db_path)
+        conn.execute("CREATE TABLE embeddings (memory_id TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        conn.commit()
+        conn.close()
+
+        store = MemoryStore(memory_config)
+        await store.connect()
+        try:
+            db = store._ensure_connected()
+            cols = {row[1] for row in db.execute("PRAGMA table_info(embeddings)")}
+            assert "dtype" in cols
+        finally:
+            await store.disconnect()
@@ -0,0 +1,138 @@
+"""Tests for scripts/migrate_chroma_to_sqlite.py."""
+
+import importlib.util
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from memory_mcp.embedding import E5EmbeddingFunction
+
+_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "migrate_chroma_to_sqlite.py"
+_spec = importlib.util.spec_from_file_location("migrate_chroma_to_sqlite", _SCRIPT)
+migrate_script = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = migrate_script
+_spec.loader.exec_module(migrate_script)
+
+
+def _make_chroma(directory: Path, n_memories: int) -> Path:
+    """Write a minimal chroma.sqlite3 with the tables the migration reads."""
+    directory.mkdir()
+    conn = sqlite3.connect(directory / "chroma.sqlite3")
+    conn.executescript(
+        """
+        CREATE TABLE collections (id TEXT, name TEXT);
+        CREATE TABLE segments (id TEXT, collection TEXT, scope TEXT);
+        CREATE TABLE embeddings (id INTEGER PRIMARY KEY, segment_id TEXT, embedding_id TEXT);
+        CREATE TABLE embedding_metadata (
+            id INTEGER, key TEXT, string_value TEXT, int_value INT, float_value REAL
+        );
+        INSERT INTO collections VALUES ('c1', 'claude_memories');
+        INSERT INTO segments VALUES ('s1', 'c1', 'METADATA');
+        """
+    )
+    for i in range(n_memories):
+        conn.execute("INSERT INTO embeddings VALUES (?, 's1', ?)", (i + 1, f"m{i}"))
+        conn.executemany(
+            "INSERT INTO embedding_metadata VALUES (?,?,?,?,?)",
+            [
+                (i + 1, "chroma:document", f"記憶 {i}", None, None),
+                (i + 1, "timestamp", "2025-01-01T00:00:00", None, None),
+                (i + 1, "importance", None, 3, None),
+                (i + 1, "coactivation", json.dumps({f"m{(i + 1) % n_memories}": 0.5}), None, None),
+            ],
+        )
+    conn.commit()
+    conn.close()
+    return directory
+
+
+@pytest.fixture
+def fake_encoder(monkeypatch):
+    """Replace the E5 model with deterministic unit vectors; returns the call log."""
+    calls: list[int] = []
+
+    def encode(self, input, batch_size=32):
+        calls.append(len(input))
+        vecs = np.zeros((len(input), 768), dtype=np.float32)
+        vecs[:, 0] = 1.0
+        return vecs
+
+    monkeypatch.setattr(E5EmbeddingFunction, "_load_model", lambda self: None)
+    monkeypatch.setattr(E5EmbeddingFunction, "encode_passage_ndarray", encode)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "y")
+    return calls
+
+
+class TestMigrateIntoExistingDatabase:
+    """Migrating into a memory.db created before the embeddings.dtype column."""
+
+    def test_adds_dtype_column(self, tmp_path: Path, fake_encoder):
+        source = _make_chroma(tmp_path / "chroma", n_memories=5)
+        dest = tmp_path / "memory.db"
+        conn = sqlite3.connect(dest)
+        conn.execute("CREATE TABLE embeddings (memory_id TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        conn.commit()
+        conn.close()
+
+        migrate_script.migrate(str(source), str(dest), batch_size=2, vector_dtype="f16")
+
+        conn = sqlite3.connect(dest)
+        try:
+            cols = {row[1] for row in conn.execute("PRAGMA table_info(embeddings)")}
+            assert "dtype" in cols
+            assert conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0] == 5
+            dtypes = {row[0] for row in conn.execute("SELECT dtype FROM embeddings")}
+            assert dtypes == {"f16"}
+        finally:
+            conn.close()
+
+
+class TestBatchSizeValidation:
+    """--batch-size below 1 must not silently migrate nothing."""
+
+    @pytest.mark.parametrize("value", ["0", "-3", "abc"])
+    def test_cli_rejects(self, value: str, monkeypatch):
+        monkeypatch.setattr("sys.argv", ["migrate", "--batch-size", value])
+        with pytest.raises(SystemExit) as exc_info:
+            migrate_script.main()
+        assert exc_info.value.code == 2
+
+    def test_migrate_rejects_zero(self, tmp_path: Path, fake_encoder):
+        source = _make_chroma(tmp_path / "chroma", n_memories=3)
+        with pytest.raises(ValueError):
+            migrate_script.migrate(str(source), str(tmp_path / "memory.db"), batch_size=0)
+
+
+class TestPipelineCleanup:
+    """A failure mid-migration stops every pipeline thread and releases the write lock."""
+
+    def test_encoder_error(self, tmp_path: Path, fake_encoder, monkeypatch):
+        source = _make_chroma(tmp_path / "chroma", n_memories=20)
+        dest = tmp_path / "memory.db"
+        encode = E5EmbeddingFunction.encode_passage_ndarray
+
+        def flaky_encode(self, input, batch_size=32):
+            if len(fake_encoder) == 1:
+                raise RuntimeError("encoder failed")
+            return encode(self, input, batch_size)
+
+        monkeypatch.setattr(E5EmbeddingFunction, "encode_passage_ndarray", flaky_encode)
+        threads_before = threading.active_count()
+
+        with pytest.raises(RuntimeError, match="encoder failed"):
+            migrate_script.migrate(str(source), str(dest), batch_size=1)
+
+        assert threading.active_count() == threads_before
+        # The first chunk was rolled back and no transaction is left open
+        conn = sqlite3.connect(dest, timeout=0)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            assert conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0] == 0
+            conn.rollback()
+        finally:
+            conn.close()
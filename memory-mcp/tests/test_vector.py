@@ -0,0 +1,154 @@
+"""Tests for numpy vector helpers."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from memory_mcp.vector import (
+    VectorIndex,
+    cosine_similarity,
+    decode_vector,
+    encode_vector,
+    encode_vector_fp16,
+    encode_vector_int8,
+    encode_vectors_bulk,
+)
+
+
+class TestEncodeVectorsBulk:
+    """encode_vectors_bulk() の動作テスト."""
+
+    def test_matches_per_row_encoding(self) -> None:
+        """各行のバイト列が encode_vector と一致する。"""
+        arr = np.random.randn(4, 8).astype(np.float32)
+        blobs = encode_vectors_bulk(arr)
+        assert blobs == [encode_vector(row.tolist()) for row in arr]
+
+    def test_round_trip(self) -> None:
+        """decode_vector で元の値に戻る。"""
+        arr = np.random.randn(3, 16)
+        blobs = encode_vectors_bulk(arr)
+        for row, blob in zip(arr, blobs):
+            np.testing.assert_allclose(decode_vector(blob), row.astype(np.float32))
+
+    def test_non_contiguous_input(self) -> None:
+        """非連続な配列（転置など）でも正しく行ごとに切り出される。"""
+        arr = np.random.randn(8, 5).astype(np.float32).T
+        blobs = encode_vectors_bulk(arr)
+        assert len(blobs) == 5
+        np.testing.assert_array_equal(decode_vector(blobs[2]), arr[2])
+
+    def test_empty(self) -> None:
+        """0 行なら空リスト。"""
+        assert encode_vectors_bulk(np.empty((0, 768), dtype=np.float32)) == []
+
+    def test_rejects_1d(self) -> None:
+        """1 次元配列はエラー。"""
+        with pytest.raises(ValueError):
+            encode_vectors_bulk(np.zeros(8, dtype=np.float32))
+
+
+class TestQuantizedVectors:
+    """f16 / i8 保存形式の動作テスト."""
+
+    def _unit_vectors(self, n: int = 4, dim: int = 768) -> np.ndarray:
+        arr = np.random.randn(n, dim).astype(np.float32)
+        return arr / np.linalg.norm(arr, axis=1, keepdims=True)
+
+    def test_fp16_round_trip(self) -> None:
+        """f16 は半分のサイズで、ほぼ元の値に戻る。"""
+        vec = self._unit_vectors(1)[0]
+        blob = encode_vector_fp16(vec)
+        assert len(blob) == 768 * 2
+        np.testing.assert_allclose(decode_vector(blob, "f16"), vec, atol=1e-3)
+
+    def test_int8_round_trip(self) -> None:
+        """i8 はスケール 4 バイト + 1 バイト/次元で、コサイン類似度がほぼ保たれる。"""
+        vec = self._unit_vectors(1)[0]
+        blob = encode_vector_int8(vec)
+        assert len(blob) == 4 + 768
+        decoded = decode_vector(blob, "i8")
+        assert decoded.dtype == np.float32
+        cos = float(decoded @ vec / np.linalg.norm(decoded))
+        assert cos > 0.999
+
+    def test_int8_zero_vector(self) -> None:
+        """ゼロベクトルもゼロに戻る。"""
+        decoded = decode_vector(encode_vector_int8(np.zeros(8)), "i8")
+        np.testing.assert_array_equal(decoded, np.zeros(8, dtype=np.float32))
+
+    def test_bulk_matches_single(self) -> None:
+        """bulk 版は 1 行ずつの関数と同じバイト列を返す。"""
+        arr = self._unit_vectors()
+        assert encode_vectors_bulk(arr, "f16") == [encode_vector_fp16(row) for row in arr]
+        assert encode_vectors_bulk(arr, "i8") == [encode_vector_int8(row) for row in arr]
+
+    def test_unknown_dtype(self) -> None:
+        """未知の形式はエラー。"""
+        with pytest.raises(ValueError):
+            encode_vectors_bulk(np.zeros((1, 4)), "f64")
+        with pytest.raises(ValueError):
+            decode_vector(b"", "f64")
+
+
+class TestVectorIndex:
+    """VectorIndex の動作テスト."""
+
+    def test_similarities_match_cosine_similarity(self) -> None:
+        """形式の混在した BLOB から組んだ行列でも cosine_similarity と一致する。"""
+        arr = np.random.randn(3, 16).astype(np.float32)
+        index = VectorIndex()
+        index.build([
+            ("a", encode_vectors_bulk(arr[:1])[0], "f32"),
+            ("b", encode_vectors_bulk(arr[1:2], "f16")[0], "f16"),
+            ("c", encode_vectors_bulk(arr[2:], "f32")[0], "f32"),
+        ])
+        query = np.random.randn(16).astype(np.float32)
+        np.testing.assert_allclose(
+            index.similarities(query, ["a", "b", "c"]), cosine_similarity(query, arr), atol=1e-3
+        )
+
+    def test_similarities_for_subset(self) -> None:
+        """指定した id の順にスコアを返し、未登録の id があれば None。"""
+        index = VectorIndex()
+        blobs = encode_vectors_bulk(np.eye(2, dtype=np.float32))
+        index.build([("a", blobs[0], "f32"), ("b", blobs[1], "f32")])
+        query = np.array([1.0, 0.0], dtype=np.float32)
+        np.testing.assert_allclose(index.similarities(query, ["b", "a"]), [0.0, 1.0], atol=1e-6)
+        assert index.similarities(query, ["a", "x"]) is None
+
+    def test_rebuild_during_search(self) -> None:
+        """検索中に別スレッドで作り直しても、id と行列の組がずれない。"""
+        dim = 8
+        index = VectorIndex()
+        index.build([])
+        stop = threading.Event()
+
+        def rebuild() -> None:
+            n = 1
+            while not stop.is_set():
+                blobs = encode_vectors_bulk(np.random.randn(n, dim).astype(np.float32))
+                index.build([(f"m{i}", blob, "f32") for i, blob in enumerate(blobs)])
+                n = n % 64 + 1
+
+        worker = threading.Thread(target=rebuild)
+        worker.start()
+        try:
+            query = np.random.randn(dim).astype(np.float32)
+            ids = [f"m{i}" for i in range(40)]
+            for _ in range(5000):
+                scores = index.similarities(query, ids)
+                assert scores is None or scores.shape == (len(ids),)
+        finally:
+            stop.set()
+            worker.join()
+
+    def test_dirty_flag(self) -> None:
+        """build で clean になり、mark_dirty で再び dirty になる。"""
+        index = VectorIndex()
+        assert index.is_dirty
+        index.build([])
+        assert not index.is_dirty
+        index.mark_dirty()
+        assert index.is_dirty
@@ -1,8 +1,9 @@
 """MCP Server for USB webcam capture."""
 
+import atexit
 import base64
-import io
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -19,7 +20,6 @@ from mcp.types import (
     TextContent,
     Tool,
 )
-from PIL import Image
 
 
 server = Server("usb-webcam-mcp")
@@ -30,12 +30,29 @@ CAPTURE_DIR.mkdir(parents=True, exist_ok=True)
 # Cache: camera_index -> (max_width, max_height)
 _resolution_cache: dict[int, tuple[int, int]] = {}
 
+# Pool: (camera_index, width, height) -> opened, warmed-up capture handle.
+# Opening a DirectShow device and letting exposure settle takes up to a few
+# seconds, so handles are kept for the lifetime of the process.
+_capture_pool: dict[tuple[int, int, int], cv2.VideoCapture] = {}
+_capture_locks: dict[int, threading.Lock] = {}
+
+
+def _release_captures(camera_index: int | None = None) -> None:
+    """Release pooled captures for one camera, or all cameras if None."""
+    for key in [k for k in _capture_pool if camera_index is None or k[0] == camera_index]:
+        _capture_pool.pop(key).release()
+
+
+atexit.register(_release_captures)
+
 
 def _detect_max_resolution(camera_index: int) -> tuple[int, int] | None:
     """Detect the maximum resolution for a camera and cache it."""
     if camera_index in _resolution_cache:
         return _resolution_cache[camera_index]
 
+    # The device can only be opened by one handle at a time
+    _release_captures(camera_index)
     cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
     if not cap.isOpened():
         return None
@@ -64,6 +81,28 @@ def find_available_cameras(max_cameras: int = 10) -> list[dict[str, Any]]:
     return cameras
 
 
+def _open_and_warm(camera_index: int, width: int, height: int) -> cv2.VideoCapture:
+    """Open a camera at the given resolution, warm it up and add it to the pool."""
+    # A handle opened at another resolution would keep the device busy
+    _release_captures(camera_index)
+
+    cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open camera at index {camera_index}")
+
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    # Keep the driver queue short so a reused handle doesn't return old frames
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    # Let auto-exposure settle; grab() skips decoding the discarded frames
+    for _ in range(10):
+        cap.grab()
+
+    _capture_pool[(camera_index, width, height)] = cap
+    return cap
+
+
 def capture_from_camera(
     camera_index: int = 0,
     width: int | None = None,
@@ -78,28 +117,29 @@ def capture_from_camera(
         else:
             raise RuntimeError(f"Cannot open camera at index {camera_index}")
 
-    cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
-    if not cap.isOpened():
-        raise RuntimeError(f"Cannot open camera at index {camera_index}")
-
-    try:
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-
-        for _ in range(10):
-            cap.read()
+    key = (camera_index, width, height)
+    with _capture_locks.setdefault(camera_index, threading.Lock()):
+        cap = _capture_pool.get(key)
+        if cap is None:
+            cap = _open_and_warm(camera_index, width, height)
+        else:
+            # Drop the frame buffered since the previous call
+            cap.grab()
 
-        ret, frame = cap.read()
+        ret = cap.grab()
+        if ret:
+            ret, frame = cap.retrieve()
+        else:
+            frame = None
         if not ret or frame is None:
+            # The device may have been unplugged; reopen on the next call
+            _release_captures(camera_index)
             raise RuntimeError(f"Failed to capture at {width}x{height} from camera {camera_index}")
 
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        image = Image.fromarray(frame_rgb)
-        buffer = io.BytesIO()
-        image.save(buffer, format="JPEG", quality=85)
-        return buffer.getvalue()
-    finally:
-        cap.release()
+    ok, buffer = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), 85])
+    if not ok:
+        raise RuntimeError(f"Failed to encode JPEG from camera {camera_index}")
+    return buffer.tobytes()
 
 
 @server.list_tools()
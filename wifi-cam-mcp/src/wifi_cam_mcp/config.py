@@ -1,5 +1,6 @@
 """Configuration for WiFi Camera MCP Server."""
 
+import functools
 import os
 from dataclasses import dataclass
 from pathlib import Path
@@ -27,9 +28,14 @@ class CameraConfig:
     mount_mode: str = "normal"  # "normal" (desktop) or "ceiling" (inverted)
 
     @classmethod
+    @functools.lru_cache(maxsize=None)
     def from_env(cls, prefix: str = "TAPO") -> "CameraConfig":
         """Create config from environment variables.
 
+        The result is cached per prefix since the environment is fixed for the
+        life of the process. Call ``CameraConfig.from_env.cache_clear()`` after
+        changing it.
+
         Args:
             prefix: Environment variable prefix (default: "TAPO")
                     For right camera, use "TAPO_RIGHT"
@@ -76,8 +82,9 @@ class CameraConfig:
         )
 
     @classmethod
+    @functools.lru_cache(maxsize=None)
     def right_camera_from_env(cls) -> "CameraConfig | None":
-        """Create config for right camera if configured.
+        """Create config for right camera if configured (cached like from_env).
 
         Returns:
             CameraConfig for right camera, or None if not configured
@@ -131,8 +138,9 @@ class ServerConfig:
     capture_dir: str = ""
 
     @classmethod
+    @functools.lru_cache(maxsize=None)
     def from_env(cls) -> "ServerConfig":
-        """Create config from environment variables."""
+        """Create config from environment variables (cached like CameraConfig.from_env)."""
         default_dir = os.path.join(
             os.path.expanduser("~"), ".cache", "wifi-cam-mcp"
         )
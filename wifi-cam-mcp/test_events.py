@@ -3,45 +3,205 @@
 import asyncio
 import os
 import sys
+from collections import Counter
+from dataclasses import dataclass
 
+import aiohttp
+import onvif
+import zeep.exceptions
+import zeep.wsdl.bindings.soap
 from dotenv import load_dotenv
+from lxml import etree
+from onvif import ONVIFCamera
+from onvif.const import KEEPALIVE_EXPIRY
+from onvif.settings import DEFAULT_SETTINGS
+from zeep.plugins import Plugin
 
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
+LISTEN_SECONDS = 30
+# The subscription is renewed well before it would expire, so listening
+# longer than the termination time does not silently stop the event stream
+SUBSCRIPTION_TERMINATION = "PT120S"
+RENEW_SECONDS = 60
 
-async def main():
-    import onvif
-    from onvif import ONVIFCamera
+# WSDL path (same workaround as camera.py)
+_ONVIF_DIR = os.path.dirname(onvif.__file__)
+WSDL_DIR = os.path.join(_ONVIF_DIR, "wsdl")
+if not os.path.isdir(WSDL_DIR):
+    WSDL_DIR = os.path.join(os.path.dirname(_ONVIF_DIR), "wsdl")
+
+
+def _tune_zeep_parsing():
+    """Parse SOAP replies with one reused lxml parser and no huge-tree support.
+
+    ONVIFCamera takes no zeep Settings, so the shared onvif settings object is
+    adjusted instead (strict is already off there). zeep builds a new
+    XMLParser for every reply; notification envelopes never import other
+    documents, so the resolver that parser carries is not needed.
+    """
+    DEFAULT_SETTINGS.xml_huge_tree = False
+    parser = etree.XMLParser(
+        remove_comments=True,
+        remove_blank_text=True,
+        resolve_entities=False,
+        recover=True,
+        huge_tree=False,
+    )
+
+    def parse_reply(content, transport, base_url=None, settings=None):
+        try:
+            root = etree.fromstring(content, parser=parser, base_url=base_url)
+        except etree.XMLSyntaxError as exc:
+            raise zeep.exceptions.XMLSyntaxError(
+                f"Invalid XML content received ({exc.msg})", content=content
+            ) from exc
+        dtd = root.getroottree().docinfo.internalDTD
+        if dtd is not None:
+            for entity in dtd.iterentities():
+                raise zeep.exceptions.EntitiesForbidden(entity.name, entity.content)
+        return root
+
+    # soap.py binds parse_xml at import time, so patch it there
+    zeep.wsdl.bindings.soap.parse_xml = parse_reply
+
+
+_NS = {
+    "wsnt": "http://docs.oasis-open.org/wsn/b-2",
+    "tt": "http://www.onvif.org/ver10/schema",
+}
+_NOTIFICATIONS = etree.XPath("//wsnt:NotificationMessage", namespaces=_NS)
+_TOPIC = etree.XPath("string(wsnt:Topic)", namespaces=_NS)
+_MESSAGE = etree.XPath("wsnt:Message/tt:Message", namespaces=_NS)
+_SOURCE_ITEMS = etree.XPath("tt:Source/tt:SimpleItem", namespaces=_NS)
+_DATA_ITEMS = etree.XPath("tt:Data/tt:SimpleItem", namespaces=_NS)
+_SRC_PREFIX = "src:"
+_TOPIC_SEP = "/"
+_FMT = "  %-20s %s  (%s)"
+
+
+class NotificationExtractor(Plugin):
+    """Read (topic, utc_time, items) straight from PullMessages reply XML.
+
+    The NotificationMessage elements are detached from the envelope
+    afterwards, so zeep only materializes the CurrentTime/TerminationTime
+    wrapper instead of an object tree per event.
+    """
+
+    def __init__(self):
+        self._events = []
+
+    def ingress(self, envelope, http_headers, operation):
+        if operation.name == "PullMessages":
+            for node in _NOTIFICATIONS(envelope):
+                # None unless the message carries SimpleItems (e.g. heartbeats)
+                data_items = None
+                ts = ""
+                for message in _MESSAGE(node)[:1]:
+                    ts = message.get("UtcTime", "")
+                    source = _SOURCE_ITEMS(message)
+                    data = _DATA_ITEMS(message)
+                    if source or data:
+                        data_items = {
+                            _SRC_PREFIX + item.get("Name", ""): item.get("Value") for item in source
+                        }
+                        for item in data:
+                            data_items[item.get("Name")] = item.get("Value")
+                self._events.append((_TOPIC(node).strip() or "?", ts, data_items))
+                node.getparent().remove(node)
+        return envelope, http_headers
+
+    def take(self):
+        """Return and clear the events collected since the last call."""
+        events, self._events = self._events, []
+        return events
+
+
+async def _renew_loop(subscription, interval):
+    """Renew the PullPoint subscription every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await subscription.Renew({"TerminationTime": SUBSCRIPTION_TERMINATION})
+        except Exception as e:
+            print(f"  Renew failed: {e}")
+
+
+@dataclass(frozen=True)
+class EventTestConfig:
+    """Camera connection settings from the environment / .env."""
 
-    host = os.getenv("TAPO_CAMERA_HOST", "")
-    port = int(os.getenv("TAPO_ONVIF_PORT", "2020"))
-    username = os.getenv("TAPO_USERNAME", "")
-    password = os.getenv("TAPO_PASSWORD", "")
+    host: str
+    port: int
+    username: str
+    password: str
+    # Clock-skew correction costs an extra GetSystemDateAndTime round trip;
+    # set TAPO_ADJUST_TIME=true if the camera rejects WS-Security timestamps
+    adjust_time: bool = False
+
+    @classmethod
+    def from_env(cls) -> "EventTestConfig":
+        """Read the settings once, exiting if any credential is missing or empty."""
+        env = os.environ
+        try:
+            config = cls(
+                host=env["TAPO_CAMERA_HOST"],
+                port=int(env.get("TAPO_ONVIF_PORT", "2020")),
+                username=env["TAPO_USERNAME"],
+                password=env["TAPO_PASSWORD"],
+                adjust_time=env.get("TAPO_ADJUST_TIME", "false").lower() == "true",
+            )
+        except KeyError:
+            config = None
+        if config is None or not (config.host and config.username and config.password):
+            print("Error: Set TAPO_CAMERA_HOST, TAPO_USERNAME, TAPO_PASSWORD")
+            sys.exit(1)
+        return config
 
-    if not host or not username or not password:
-        print("Error: Set TAPO_CAMERA_HOST, TAPO_USERNAME, TAPO_PASSWORD")
-        sys.exit(1)
 
-    onvif_dir = os.path.dirname(onvif.__file__)
-    wsdl_dir = os.path.join(onvif_dir, "wsdl")
+async def main():
+    config = EventTestConfig.from_env()
 
+    _tune_zeep_parsing()
     cam = ONVIFCamera(
-        host, port, username, password,
-        wsdl_dir=wsdl_dir,
-        adjust_time=True,
+        config.host, config.port, config.username, config.password,
+        wsdl_dir=WSDL_DIR,
+        adjust_time=config.adjust_time,
     )
     await cam.update_xaddrs()
-    print(f"Connected to {host}")
+    print(f"Connected to {config.host}")
+
+    # Route the event services' requests through one pooled keep-alive
+    # session. onvif still builds (and on close() tears down) a ClientSession
+    # per service; those just go unused. The keep-alive expiry stays at onvif's
+    # value since cameras drop idle connections early, and certificate checks
+    # stay off like onvif's own connectors (the transport passes no ssl=).
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            ssl=False, limit=4, ttl_dns_cache=300, keepalive_timeout=KEEPALIVE_EXPIRY
+        ),
+    )
 
-    events_service = await cam.create_events_service()
+    def share_session(service):
+        service.transport.session = session
+        return service
+
+    events_service = share_session(await cam.create_events_service())
     result = await events_service.CreatePullPointSubscription(
-        {"InitialTerminationTime": "PT120S"}
+        {"InitialTerminationTime": SUBSCRIPTION_TERMINATION}
     )
     sub_addr = result.SubscriptionReference.Address._value_1
     cam.xaddrs[
         "http://www.onvif.org/ver10/events/wsdl/PullPointSubscription"
     ] = sub_addr
-    pullpoint = await cam.create_pullpoint_service()
+    pullpoint = share_session(await cam.create_pullpoint_service())
+    extractor = NotificationExtractor()
+    pullpoint.zeep_client.plugins.append(extractor)
+    try:
+        sub = share_session(await cam.create_subscription_service("PullPointSubscription"))
+    except Exception as e:
+        print(f"  Subscription service unavailable (no Renew/Unsubscribe): {e}")
+        sub = None
 
     # Force the camera to send current state of all event properties
     print("Calling SetSynchronizationPoint...")
@@ -51,57 +211,84 @@ async def main():
     except Exception as e:
         print(f"  SetSynchronizationPoint failed: {e}")
 
-    print("\nListening for events (30 seconds)...")
+    print(f"\nListening for events ({LISTEN_SECONDS} seconds)...")
     print("-" * 60)
 
-    seen_events = []
-    for i in range(10):
-        try:
-            messages = await pullpoint.PullMessages({
-                "Timeout": "PT3S",
-                "MessageLimit": 50,
-            })
-            if messages.NotificationMessage:
-                for msg in messages.NotificationMessage:
-                    topic = msg.Topic._value_1 if msg.Topic else "?"
-                    # Short topic name
-                    short = topic.split("/")[-1] if "/" in topic else topic
-                    data_items = {}
-                    ts = ""
-                    if msg.Message and msg.Message._value_1:
-                        d = msg.Message._value_1
-                        ts = getattr(d, "UtcTime", "") or ""
-                        if hasattr(d, "Source") and d.Source:
-                            for item in (d.Source.SimpleItem or []):
-                                data_items[f"src:{item.Name}"] = item.Value
-                        if hasattr(d, "Data") and d.Data:
-                            for item in (d.Data.SimpleItem or []):
-                                data_items[item.Name] = item.Value
-                    print(f"  {short:20s} {data_items}  ({ts})")
-                    seen_events.append(topic)
-            else:
-                print(f"  ... (no events, pull #{i})")
-        except Exception as e:
-            print(f"  Error: {e}")
-            break
+    # Long-poll: the camera holds each request open until events arrive or
+    # the remaining time runs out, so a quiet camera costs a single request
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LISTEN_SECONDS
+
+    def start_pull():
+        """Issue the next pull, or return None once the deadline has passed."""
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return None
+        return asyncio.create_task(pullpoint.PullMessages({
+            "Timeout": f"PT{max(1, int(remaining))}S",
+            "MessageLimit": 1024,
+        }))
+
+    seen_events = Counter()
+    pull_count = 0
+    renew_task = asyncio.create_task(_renew_loop(sub, RENEW_SECONDS)) if sub else None
+    next_pull = start_pull()
+    try:
+        while next_pull is not None:
+            pull_count += 1
+            try:
+                await next_pull
+                events = extractor.take()
+                # Keep the next request in flight while this batch is printed.
+                # create_task() only schedules it; yield once so the task runs
+                # up to its first real network wait before we start formatting.
+                next_pull = start_pull()
+                await asyncio.sleep(0)
+                if events:
+                    # One write per batch instead of one print per event
+                    out = []
+                    for topic, ts, data_items in events:
+                        # Short topic name
+                        short = topic.rpartition(_TOPIC_SEP)[2]
+                        out.append(_FMT % (short, "{}" if data_items is None else data_items, ts))
+                        seen_events[topic] += 1
+                    sys.stdout.write("\n".join(out) + "\n")
+                else:
+                    print(f"  ... (no events, pull #{pull_count})")
+            except Exception as e:
+                print(f"  Error: {e}")
+                break
+    finally:
+        if next_pull is not None:
+            next_pull.cancel()
+        if renew_task is not None:
+            renew_task.cancel()
 
     print("-" * 60)
     if seen_events:
-        unique = set(seen_events)
-        print(f"\n{len(seen_events)} events total, {len(unique)} unique topics:")
-        for t in sorted(unique):
-            count = seen_events.count(t)
+        total = sum(seen_events.values())
+        print(f"\n{total} events total, {len(seen_events)} unique topics:")
+        for t, count in sorted(seen_events.items()):
             print(f"  [{count}x] {t}")
     else:
         print("No events detected.")
 
-    try:
-        sub = await cam.create_subscription_service("PullPointSubscription")
-        await sub.Unsubscribe()
-    except Exception:
-        pass
-    await cam.close()
+    # Unsubscribe goes through the shared session, so it can run while
+    # cam.close() tears down the per-service sessions
+    teardown = [cam.close()]
+    if sub is not None:
+        teardown.append(sub.Unsubscribe())
+    for r in await asyncio.gather(*teardown, return_exceptions=True):
+        if isinstance(r, Exception):
+            print(f"  Teardown error: {r}")
+    await session.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        # Optional: libuv-based event loop (not available on Windows)
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())